@@ -1,5 +1,6 @@
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Annotated, Optional
+from typing import Annotated, Iterator, Optional
 
 import httpx
 from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, UploadFile
@@ -9,6 +10,7 @@ from pydantic import BaseModel
 from app.api.auth import verify_api_key
 from app.core.config import settings
 from app.services.parser import DocumentParser, cleanup_files
+from app.services.watchdog import WorkerDraining, watchdog
 
 router = APIRouter()
 
@@ -38,6 +40,23 @@ def _download_to(url: str, target: Path) -> None:
                 handle.write(chunk)
 
 
+@contextmanager
+def _tracked_parse() -> Iterator[None]:
+    # Refuse before any download or upload I/O if this worker is being recycled.
+    try:
+        watchdog.begin_parse()
+    except WorkerDraining as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Worker is restarting, retry the request",
+            headers={"Retry-After": "1"},
+        ) from exc
+    try:
+        yield
+    finally:
+        watchdog.end_parse()
+
+
 def _parse_to_markdown(target: Path) -> str:
     parser = DocumentParser()
     try:
@@ -71,15 +90,16 @@ def parse_pdf_json(payload: ParseRequest) -> JSONResponse:
     temp_dir.mkdir(parents=True, exist_ok=True)
     cleanup: list[Path] = []
 
-    try:
-        target = temp_dir / "download.pdf"
-        _download_to(payload.url, target)
-        _enforce_size_limit(target)
+    with _tracked_parse():
+        try:
+            target = temp_dir / "download.pdf"
+            _download_to(payload.url, target)
+            _enforce_size_limit(target)
 
-        cleanup.append(target)
-        markdown = _parse_to_markdown(target)
-    finally:
-        cleanup_files(cleanup)
+            cleanup.append(target)
+            markdown = _parse_to_markdown(target)
+        finally:
+            cleanup_files(cleanup)
 
     return JSONResponse({"markdown": markdown})
 
@@ -95,16 +115,17 @@ def parse_pdf_file(
     temp_dir.mkdir(parents=True, exist_ok=True)
     cleanup: list[Path] = []
 
-    try:
-        if file.content_type not in {"application/pdf"}:
-            raise HTTPException(status_code=400, detail="Only PDF files supported")
-        target = temp_dir / file.filename if file.filename else temp_dir / "upload.pdf"
-        _save_upload(file, target)
-        _enforce_size_limit(target)
-
-        cleanup.append(target)
-        markdown = _parse_to_markdown(target)
-    finally:
-        cleanup_files(cleanup)
+    with _tracked_parse():
+        try:
+            if file.content_type not in {"application/pdf"}:
+                raise HTTPException(status_code=400, detail="Only PDF files supported")
+            target = temp_dir / file.filename if file.filename else temp_dir / "upload.pdf"
+            _save_upload(file, target)
+            _enforce_size_limit(target)
+
+            cleanup.append(target)
+            markdown = _parse_to_markdown(target)
+        finally:
+            cleanup_files(cleanup)
 
     return JSONResponse({"markdown": markdown})
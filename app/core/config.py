@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     api_keys: str = ""
     workers: int = 2
     worker_timeout: int = 600
+    worker_max_rss_mb: int = 1536
+    worker_max_parses: int = 200
+    worker_recycle_jitter: float = 0.1
+    worker_check_interval_s: float = 5.0
     docling_num_threads: int = 2
     docling_device: str = "auto"
     docling_timeout_s: float | None = 500.0
@@ -0,0 +1,218 @@
+import fcntl
+import logging
+import math
+import os
+import random
+import resource
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerDraining(Exception):
+    """Raised when a parse is refused because the worker is being recycled."""
+
+
+def current_rss_mb() -> Optional[float]:
+    """Return the resident set size of this process in megabytes, or None without procfs."""
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in megabytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+def _jittered(limit: float, jitter: float) -> float:
+    """Lower a limit by a random fraction so workers cross it at different times."""
+    if limit <= 0:
+        return 0
+    return limit * (1 - random.uniform(0, max(0.0, min(jitter, 1.0))))
+
+
+class MemoryWatchdog:
+    """
+    Recycle the current worker once it uses too much memory or has parsed too many documents.
+
+    When a limit is reached the worker sends itself SIGTERM, which uvicorn handles
+    by closing its listening socket and finishing in-flight requests, so the other
+    workers pick up new connections while gunicorn spawns a replacement. An
+    exclusive lock file shared by all workers ensures only one worker recycles at
+    a time; the others keep serving and retry on the next check.
+    """
+
+    def __init__(
+        self,
+        max_rss_mb: float,
+        max_parses: int,
+        jitter: float,
+        check_interval_s: float,
+        lock_path: Path,
+    ) -> None:
+        self.rss_limit_mb = _jittered(max_rss_mb, jitter)
+        # Round up so jitter never turns a small limit into 0, which means disabled.
+        self.parse_limit = (
+            max(1, math.ceil(_jittered(max_parses, jitter))) if max_parses > 0 else 0
+        )
+        self._check_interval_s = check_interval_s
+        self._lock_path = lock_path
+        self._lock_handle: Optional[IO[str]] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.parses = 0
+        self.in_flight = 0
+        self.draining = False
+        self.reason: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rss_limit_mb > 0 or self.parse_limit > 0
+
+    def begin_parse(self) -> None:
+        """Count a parse as in flight; refuse it while draining."""
+        with self._cond:
+            if self.draining:
+                raise WorkerDraining(self.reason or "draining")
+            self.in_flight += 1
+
+    def end_parse(self) -> None:
+        """Mark an in-flight parse as finished."""
+        with self._cond:
+            self.in_flight -= 1
+            self.parses += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def track_parse(self) -> Iterator[None]:
+        """Count a parse for the duration of the block; refuse it while draining."""
+        self.begin_parse()
+        try:
+            yield
+        finally:
+            self.end_parse()
+
+    def start(self) -> None:
+        """Start the sampling thread. Only call this in a gunicorn worker process."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="memory-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            "Memory watchdog started",
+            extra={
+                "pid": os.getpid(),
+                "rss_limit_mb": round(self.rss_limit_mb, 1),
+                "parse_limit": self.parse_limit,
+            },
+        )
+
+    def check(self) -> Optional[str]:
+        """Sample memory and parse count, and start draining if a limit is reached."""
+        rss_mb = current_rss_mb()
+        with self._cond:
+            if self.draining:
+                return self.reason
+            if self.rss_limit_mb and rss_mb is not None and rss_mb >= self.rss_limit_mb:
+                reason = "max_rss"
+            elif self.parse_limit and self.parses >= self.parse_limit:
+                reason = "max_parses"
+            else:
+                return None
+
+        if not self._acquire_recycle_lock():
+            logger.debug(
+                "Recycle postponed, another worker is recycling",
+                extra={"pid": os.getpid(), "reason": reason},
+            )
+            return None
+
+        with self._cond:
+            if self.draining:
+                return self.reason
+            self.draining = True
+            self.reason = reason
+            in_flight = self.in_flight
+            self._cond.notify_all()
+
+        logger.info(
+            "Worker draining",
+            extra={
+                "pid": os.getpid(),
+                "reason": reason,
+                "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+                "in_flight": in_flight,
+            },
+        )
+        # Uvicorn treats SIGTERM as a graceful shutdown: it stops listening and
+        # finishes in-flight requests within graceful_timeout.
+        os.kill(os.getpid(), signal.SIGTERM)
+        return reason
+
+    def _acquire_recycle_lock(self) -> bool:
+        if self._lock_handle is not None:
+            return True
+        try:
+            self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+            handle = self._lock_path.open("w")
+        except OSError:
+            # Without a lock we cannot stagger, but recycling beats an OOM kill.
+            return True
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        # Held until the process exits, when the kernel releases it.
+        self._lock_handle = handle
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self.check()
+            with self._cond:
+                if self.draining and self.in_flight == 0:
+                    break
+                self._cond.wait(timeout=self._check_interval_s)
+        self._recycle()
+
+    def _recycle(self) -> None:
+        rss_mb = current_rss_mb()
+        logger.warning(
+            "Worker recycling",
+            extra={
+                "pid": os.getpid(),
+                "reason": self.reason,
+                "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "rss_limit_mb": round(self.rss_limit_mb, 1),
+                "parses": self.parses,
+                "parse_limit": self.parse_limit,
+            },
+        )
+
+
+watchdog = MemoryWatchdog(
+    max_rss_mb=settings.worker_max_rss_mb,
+    max_parses=settings.worker_max_parses,
+    jitter=settings.worker_recycle_jitter,
+    check_interval_s=settings.worker_check_interval_s,
+    lock_path=Path(settings.temp_dir) / ".recycle.lock",
+)
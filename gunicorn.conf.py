@@ -12,6 +12,8 @@ workers = int(os.getenv("PDF_PARSER_WORKERS", "2"))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
 timeout = int(os.getenv("PDF_PARSER_WORKER_TIMEOUT", "600"))
+# Give recycled workers as long to drain in-flight parses as a parse may take
+graceful_timeout = timeout
 keepalive = 5
 
 # Logging
@@ -33,3 +35,11 @@ tmp_upload_dir = None
 # SSL (disabled by default, configure if needed)
 keyfile = None
 certfile = None
+
+
+# Server hooks
+def post_worker_init(worker):
+    # Recycle the worker before Docling's memory growth hits the container limit
+    from app.services.watchdog import watchdog
+
+    watchdog.start()
@@ -0,0 +1,156 @@
+import threading
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import watchdog as watchdog_module
+from app.services.watchdog import MemoryWatchdog, WorkerDraining
+
+
+@pytest.fixture
+def kills() -> Iterator[list[int]]:
+    """Record the signals the watchdog sends instead of terminating the test run."""
+    sent: list[int] = []
+    with patch.object(watchdog_module.os, "kill", lambda pid, sig: sent.append(sig)):
+        yield sent
+
+
+@pytest.fixture
+def make_watchdog(tmp_path: Path) -> Iterator[Callable[..., MemoryWatchdog]]:
+    created: list[MemoryWatchdog] = []
+
+    def _watchdog(
+        max_rss_mb: float = 0,
+        max_parses: int = 0,
+        jitter: float = 0.0,
+    ) -> MemoryWatchdog:
+        watchdog = MemoryWatchdog(
+            max_rss_mb=max_rss_mb,
+            max_parses=max_parses,
+            jitter=jitter,
+            check_interval_s=0.05,
+            lock_path=tmp_path / ".recycle.lock",
+        )
+        created.append(watchdog)
+        return watchdog
+
+    yield _watchdog
+
+    for watchdog in created:
+        if watchdog._lock_handle is not None:
+            watchdog._lock_handle.close()
+
+
+def test_disabled_when_no_limits(make_watchdog: Callable[..., MemoryWatchdog]) -> None:
+    """Watchdog should be disabled when both limits are zero."""
+    watchdog = make_watchdog()
+    assert not watchdog.enabled
+    assert watchdog.check() is None
+
+
+def test_parse_limit_starts_draining(
+    make_watchdog: Callable[..., MemoryWatchdog], kills: list[int]
+) -> None:
+    """Reaching the parse limit should stop accepting and refuse new parses."""
+    watchdog = make_watchdog(max_parses=2)
+
+    for _ in range(2):
+        with watchdog.track_parse():
+            pass
+
+    assert watchdog.check() == "max_parses"
+    assert len(kills) == 1
+    with pytest.raises(WorkerDraining):
+        with watchdog.track_parse():
+            pass
+    assert watchdog.in_flight == 0
+
+
+def test_rss_limit_starts_draining(
+    make_watchdog: Callable[..., MemoryWatchdog], kills: list[int]
+) -> None:
+    """Exceeding the memory limit should start draining."""
+    watchdog = make_watchdog(max_rss_mb=1)
+    assert watchdog.check() == "max_rss"
+    assert watchdog.draining
+
+
+def test_rss_limit_skipped_without_procfs(
+    make_watchdog: Callable[..., MemoryWatchdog], kills: list[int]
+) -> None:
+    """Without a current RSS reading the memory limit should not trigger."""
+    watchdog = make_watchdog(max_rss_mb=1)
+    with patch.object(watchdog_module, "current_rss_mb", return_value=None):
+        assert watchdog.check() is None
+    assert not kills
+
+
+def test_only_one_worker_recycles_at_a_time(
+    make_watchdog: Callable[..., MemoryWatchdog], kills: list[int]
+) -> None:
+    """A second worker should postpone recycling while another holds the lock."""
+    first = make_watchdog(max_rss_mb=1)
+    second = make_watchdog(max_rss_mb=1)
+
+    assert first.check() == "max_rss"
+    assert second.check() is None
+    assert not second.draining
+    assert len(kills) == 1
+
+
+def test_jitter_lowers_limits(make_watchdog: Callable[..., MemoryWatchdog]) -> None:
+    """Jitter should only ever lower the configured limits."""
+    watchdog = make_watchdog(max_rss_mb=1000, max_parses=100, jitter=0.5)
+    assert 500 <= watchdog.rss_limit_mb <= 1000
+    assert 50 <= watchdog.parse_limit <= 100
+
+
+def test_jitter_keeps_small_parse_limit_enabled(
+    make_watchdog: Callable[..., MemoryWatchdog],
+) -> None:
+    """Jitter should never round a positive parse limit down to 0 (disabled)."""
+    for _ in range(20):
+        watchdog = make_watchdog(max_parses=1, jitter=0.1)
+        assert watchdog.parse_limit == 1
+        assert watchdog.enabled
+
+
+def test_recycle_waits_for_in_flight_parses(
+    make_watchdog: Callable[..., MemoryWatchdog], kills: list[int]
+) -> None:
+    """The worker should only recycle once every in-flight parse has finished."""
+    watchdog = make_watchdog(max_parses=1)
+    recycled = threading.Event()
+
+    with patch.object(watchdog, "_recycle", side_effect=recycled.set):
+        with watchdog.track_parse():
+            pass
+        watchdog.begin_parse()
+        watchdog.start()
+
+        assert not recycled.wait(timeout=0.3)
+        assert watchdog.draining
+        assert len(kills) == 1
+
+        watchdog.end_parse()
+        assert recycled.wait(timeout=2)
+
+
+def test_parse_route_returns_503_while_draining() -> None:
+    """Parse routes should answer 503 with Retry-After while the worker drains."""
+    from app.api import routes
+    from app.main import app
+
+    client = TestClient(app)
+    with (
+        patch.object(routes.watchdog, "draining", True),
+        patch.object(routes, "_download_to") as download,
+    ):
+        response = client.post("/parse/pdf", json={"url": "https://example.com/test.pdf"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    download.assert_not_called()